@@ -4,7 +4,10 @@ Grade 12 Exam Day Planner Generator
 Creates a PDF planner with exam schedules highlighted
 """
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import groupby
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -14,6 +17,7 @@ from reportlab.platypus.flowables import KeepTogether
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+import io
 import os
 import json
 import click
@@ -40,94 +44,154 @@ dark_grey = colors.Color(0.3, 0.3, 0.3)  # Dark grey for text
 muted_grey = colors.Color(0.9, 0.9, 0.9)  # Muted grey for weekends
 
 
+@dataclass(slots=True, frozen=True)
+class SubjectMeta:
+    """Per-subject rendering attributes: table/cell color, display abbreviation and emoji"""
+    color: colors.Color
+    abbreviation: str
+    emoji: str
+
+
+@dataclass(slots=True, frozen=True)
+class Exam:
+    """A single exam paper with its parsed start and end datetimes"""
+    paper: str
+    start: datetime
+    end: datetime
+
+
+@dataclass(slots=True, frozen=True)
+class PlannerConfig:
+    """Planner metadata resolved from the JSON once: titles, planner date range and year"""
+    title: str
+    trial_display_name: str
+    final_display_name: str
+    start_date: datetime
+    end_date: datetime
+    year: int
+
+
 def build_runtime_structures(exam_timetable):
-    """Build in-memory structures from current JSON for rendering (colors, abbreviations, emojis, and parsed datetimes)."""
-    trial_exams = {}
-    final_exams = {}
-    subject_colors = {}
-    subject_abbreviations = {}
-    subject_emojis = {}
+    """Build in-memory structures from current JSON for rendering (colors, abbreviations, emojis, and parsed datetimes).
+
+    Trial and final exams are returned as lists of (subject, exam) pairs sorted by start time,
+    along with the same pairs from both schedules bucketed by exam date and the planner metadata.
+    """
+    trial_exams = []
+    final_exams = []
+    subjects = {}
 
     for subject_name, subject_data in exam_timetable.get("subjects", {}).items():
         # Subject attributes
         color_triplet = subject_data.get("color", [1, 1, 1])
-        subject_colors[subject_name] = colors.Color(*color_triplet)
-        subject_abbreviations[subject_name] = subject_data.get("abbreviation", subject_name)
-        subject_emojis[subject_name] = subject_data.get("emoji", "")
+        subjects[subject_name] = SubjectMeta(
+            color=colors.Color(*color_triplet),
+            abbreviation=subject_data.get("abbreviation", subject_name),
+            emoji=subject_data.get("emoji", ""),
+        )
 
         # Exams: parse ISO datetimes to datetime objects expected by renderer
-        trial_exams[subject_name] = []
-        for exam in subject_data.get("exam_types", {}).get("trial", {}).get("exams", []):
-            trial_exams[subject_name].append({
-                "paper": exam.get("paper", ""),
-                "start": datetime.fromisoformat(exam["start_datetime"]),
-                "end": datetime.fromisoformat(exam["end_datetime"]),
-            })
-
-        final_exams[subject_name] = []
-        for exam in subject_data.get("exam_types", {}).get("final", {}).get("exams", []):
-            final_exams[subject_name].append({
-                "paper": exam.get("paper", ""),
-                "start": datetime.fromisoformat(exam["start_datetime"]),
-                "end": datetime.fromisoformat(exam["end_datetime"]),
-            })
-
-    return trial_exams, final_exams, subject_colors, subject_abbreviations, subject_emojis
+        exam_types = subject_data.get("exam_types", {})
+        for exam_type, exam_list in (("trial", trial_exams), ("final", final_exams)):
+            exam_list.extend(
+                (subject_name, Exam(
+                    paper=exam.get("paper", ""),
+                    start=datetime.fromisoformat(exam["start_datetime"]),
+                    end=datetime.fromisoformat(exam["end_datetime"]),
+                ))
+                for exam in exam_types.get(exam_type, {}).get("exams", [])
+            )
+
+    # Sort once here so the summary tables and planner pages can iterate in date order
+    trial_exams.sort(key=lambda x: x[1].start)
+    final_exams.sort(key=lambda x: x[1].start)
+
+    # Bucket both schedules by date for the daily planner; each day's list stays in start order
+    exams_by_date = {}
+    for subject, exam in sorted(trial_exams + final_exams, key=lambda x: x[1].start):
+        exams_by_date.setdefault(exam.start.date(), []).append((subject, exam))
+
+    metadata = exam_timetable['metadata']
+    config = PlannerConfig(
+        title=metadata['title'],
+        trial_display_name=exam_timetable['exams']['trial']['display_name'],
+        final_display_name=exam_timetable['exams']['final']['display_name'],
+        start_date=datetime.fromisoformat(metadata['planner_start_date']),
+        end_date=datetime.fromisoformat(metadata['planner_end_date']),
+        year=metadata['year'],
+    )
+
+    return trial_exams, final_exams, subjects, exams_by_date, config
+
+def _register_first_font(font_name, paths, label):
+    """Register font_name from the first candidate file that exists and loads; return True on success"""
+    for path in (p for p in paths if os.path.isfile(p)):
+        try:
+            pdfmetrics.registerFont(TTFont(font_name, path))
+            print(f"Registered {label} font: {path}")
+            return True
+        except Exception as e:
+            print(f"Failed to register {label} font at {path}: {e}")
+    return False
+
+# Fonts resolved by the first register_fonts() call
+_registered_fonts = None
 
 # Register both text and emoji fonts
 def register_fonts():
     """Register Public Sans for text and Noto Color Emoji for emojis"""
+    global _registered_fonts
+    if _registered_fonts is not None:
+        return _registered_fonts
+
     fonts = {'text_font': 'Helvetica', 'emoji_font': 'Helvetica'}
     
     try:
-        # Try to find and register PublicSans-VariableFont_wght.ttf
-        public_sans_paths = [
+        # Try to find and register PublicSans-SemiBold.ttf, or only the file
+        # named by GRADE12_TEXT_FONT when it is set
+        text_env = os.environ.get('GRADE12_TEXT_FONT')
+        public_sans_paths = [text_env] if text_env else [
             './PublicSans-SemiBold.ttf',  # Current directory
             '/System/Library/Fonts/PublicSans-SemiBold.ttf',
             '/Library/Fonts/PublicSans-SemiBold.ttf',
             os.path.expanduser('~/Downloads/PublicSans-SemiBold.ttf'),
         ]
+        if _register_first_font('PublicSansFont', public_sans_paths, 'text'):
+            fonts['text_font'] = 'PublicSansFont'
         
-        for path in public_sans_paths:
-            if os.path.exists(path):
-                try:
-                    pdfmetrics.registerFont(TTFont('PublicSansFont', path))
-                    fonts['text_font'] = 'PublicSansFont'
-                    print(f"Registered text font: {path}")
-                    break
-                except Exception as e:
-                    print(f"Failed to register Public Sans at {path}: {e}")
-                    continue
-        
-        # Try to find and register NotoColorEmoji-Regular.ttf
-        noto_emoji_paths = [
+        # Try to find and register NotoEmoji-Regular.ttf, or only the file
+        # named by GRADE12_EMOJI_FONT when it is set
+        emoji_env = os.environ.get('GRADE12_EMOJI_FONT')
+        noto_emoji_paths = [emoji_env] if emoji_env else [
             './NotoEmoji-Regular.ttf',  # Current directory
             '/System/Library/Fonts/NotoEmoji-Regular.ttf',
             '/Library/Fonts/NotoEmoji-Regular.ttf',
             os.path.expanduser('~/Downloads/NotoEmoji-Regular.ttf'),
         ]
-        
-        for path in noto_emoji_paths:
-            if os.path.exists(path):
-                try:
-                    pdfmetrics.registerFont(TTFont('NotoEmojiFont', path))
-                    fonts['emoji_font'] = 'NotoEmojiFont'
-                    print(f"Registered emoji font: {path}")
-                    break
-                except Exception as e:
-                    print(f"Failed to register Noto Color Emoji at {path}: {e}")
-                    continue
-        
-        return fonts
+        if _register_first_font('NotoEmojiFont', noto_emoji_paths, 'emoji'):
+            fonts['emoji_font'] = 'NotoEmojiFont'
         
     except Exception as e:
         print(f"Font registration failed: {e}")
-        return fonts
 
-# Register both fonts
-FONTS = register_fonts()
-TEXT_FONT = FONTS['text_font']
-EMOJI_FONT = FONTS['emoji_font']
+    _registered_fonts = fonts
+    return fonts
+
+# Font names used when drawing; Helvetica until _ensure_fonts() registers the TTFs
+TEXT_FONT = 'Helvetica'
+EMOJI_FONT = 'Helvetica'
+
+def _ensure_fonts():
+    """Register both fonts on first use and point TEXT_FONT/EMOJI_FONT at them"""
+    global TEXT_FONT, EMOJI_FONT
+    fonts = register_fonts()
+    TEXT_FONT = fonts['text_font']
+    EMOJI_FONT = fonts['emoji_font']
+
+
+def _format_hm(dt: datetime) -> str:
+    # Same output as dt.strftime('%H:%M') without going through strftime
+    return f"{dt.hour:02d}:{dt.minute:02d}"
 
 
 def _format_duration(delta: timedelta) -> str:
@@ -142,15 +206,75 @@ def _format_duration(delta: timedelta) -> str:
     return " ".join(parts) if parts else "0m"
 
 
-def create_exam_paragraph(subject, exam, subject_emojis, subject_abbreviations):
+# Available width in landscape A4 is about 10.2 inches (11.7 - 1.5 for margins)
+AVAILABLE_WIDTH = 10.2 * inch
+DAILY_TIME_COL_WIDTH = 0.8 * inch
+
+# Hours shown in the daily planner (7 AM to 11 PM) and their time-column labels
+FIRST_HOUR = 7
+LAST_HOUR = 23
+HOUR_LABELS = tuple(
+    "12:00 PM" if hour == 12 else f"{hour - 12}:00 PM" if hour > 12 else f"{hour}:00 AM"
+    for hour in range(FIRST_HOUR, LAST_HOUR + 1)
+)
+
+# Paragraph styles shared by the summary and daily planner pages
+STYLES = getSampleStyleSheet()
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=STYLES['Title'],
+    fontSize=16,
+    spaceAfter=20,
+    alignment=TA_CENTER
+)
+
+# Common summary table style with smaller font and dark grey text; the content
+# font is added per table since TEXT_FONT is only resolved when generating
+SUMMARY_TABLE_STYLE = (
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('TEXTCOLOR', (0, 1), (-1, -1), dark_grey),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, dark_grey)
+)
+
+# Base daily planner table style - no font settings for content since we use Paragraph objects
+DAILY_TABLE_STYLE = (
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),  # Increased header font size from 7 to 9
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+    ('GRID', (0, 0), (-1, -1), 1, dark_grey),
+)
+
+# Shared style for exam cells in the daily planner
+EXAM_STYLE = ParagraphStyle(
+    'ExamStyle',
+    fontSize=9,  # Increased from 7 to 9
+    textColor=dark_grey,
+    alignment=TA_CENTER,
+    leading=10  # Increased leading proportionally
+)
+
+
+def create_exam_paragraph(subject, exam, subjects):
     """Create a paragraph with emoji and text using different fonts, including time window and duration"""
-    emoji = subject_emojis[subject]
-    subject_abbrev = subject_abbreviations[subject]
-    paper = exam['paper']
-    start = exam['start']
-    end = exam['end']
+    meta = subjects[subject]
+    emoji = meta.emoji
+    subject_abbrev = meta.abbreviation
+    paper = exam.paper
+    start = exam.start
+    end = exam.end
     duration = end - start
-    time_str = f"{start.strftime('%H:%M')}–{end.strftime('%H:%M')} ({_format_duration(duration)})"
+    time_str = f"{_format_hm(start)}–{_format_hm(end)} ({_format_duration(duration)})"
 
     # Create paragraph with mixed fonts - emoji font for emoji, bold text font for text
     content = (
@@ -159,75 +283,47 @@ def create_exam_paragraph(subject, exam, subject_emojis, subject_abbreviations):
         f'{time_str}</font>'
     )
 
-    # Create paragraph style
-    style = ParagraphStyle(
-        'ExamStyle',
-        fontSize=9,  # Increased from 7 to 9
-        textColor=dark_grey,
-        alignment=TA_CENTER,
-        leading=10  # Increased leading proportionally
-    )
+    return Paragraph(content, EXAM_STYLE)
 
-    return Paragraph(content, style)
+def _subject_backgrounds(exam_list, subjects):
+    """Subject-column BACKGROUND commands for a summary table, one per run of consecutive same-subject rows"""
+    commands = []
+    row = 1  # first row after the header
+    for subject, run in groupby(exam_list, key=lambda x: x[0]):
+        last_row = row + sum(1 for _ in run) - 1
+        commands.append(('BACKGROUND', (0, row), (0, last_row), subjects[subject].color))
+        row = last_row + 1
+    return commands
 
-def create_exam_summary_page(doc_elements, exam_timetable, legacy_data):
+def create_exam_summary_page(doc_elements, runtime_data):
     """Create the first page with exam summary tables side by side"""
-    trial_exams, final_exams, subject_colors, subject_abbreviations, subject_emojis = legacy_data
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Title'],
-        fontSize=16,
-        spaceAfter=20,
-        alignment=TA_CENTER
-    )
-
+    trial_exams, final_exams, subjects, exams_by_date, config = runtime_data
     # Title from metadata
-    title = Paragraph(exam_timetable['metadata']['title'], title_style)
+    title = Paragraph(config.title, TITLE_STYLE)
     doc_elements.append(title)
     doc_elements.append(Spacer(1, 12))
 
-    # Sort all exams by date
-    trial_exam_list = []
-    for subject, exams in trial_exams.items():
-        for exam in exams:
-            trial_exam_list.append((subject, exam))
-    trial_exam_list.sort(key=lambda x: x[1]['start'])
+    # Use text font for summary content
+    summary_style = [*SUMMARY_TABLE_STYLE, ('FONTNAME', (0, 1), (-1, -1), TEXT_FONT)]
 
-    final_exam_list = []
-    for subject, exams in final_exams.items():
-        for exam in exams:
-            final_exam_list.append((subject, exam))
-    final_exam_list.sort(key=lambda x: x[1]['start'])
-
-    # Create trial exams table
+    # Create trial exams table with its subject cells coloured
     trial_data = [['Subject', 'Paper', 'Date', 'Time']]
-    trial_row = 1
-    trial_subject_rows = {}
-    for subject, exam in trial_exam_list:
-        date_str = exam['start'].strftime('%a, %b %d')
-        time_str = f"{exam['start'].strftime('%H:%M')}-{exam['end'].strftime('%H:%M')}"
-        trial_data.append([subject_abbreviations[subject], exam['paper'], date_str, time_str])
-        if subject not in trial_subject_rows:
-            trial_subject_rows[subject] = []
-        trial_subject_rows[subject].append(trial_row)
-        trial_row += 1
-
-    # Create final exams table
+    for subject, exam in trial_exams:
+        date_str = exam.start.strftime('%a, %b %d')
+        time_str = f"{_format_hm(exam.start)}-{_format_hm(exam.end)}"
+        trial_data.append([subjects[subject].abbreviation, exam.paper, date_str, time_str])
+    trial_table_style = summary_style + _subject_backgrounds(trial_exams, subjects)
+
+    # Create final exams table with its subject cells coloured
     final_data = [['Subject', 'Paper', 'Date', 'Time']]
-    final_row = 1
-    final_subject_rows = {}
-    for subject, exam in final_exam_list:
-        date_str = exam['start'].strftime('%a, %b %d')
-        time_str = f"{exam['start'].strftime('%H:%M')}-{exam['end'].strftime('%H:%M')}"
-        final_data.append([subject_abbreviations[subject], exam['paper'], date_str, time_str])
-        if subject not in final_subject_rows:
-            final_subject_rows[subject] = []
-        final_subject_rows[subject].append(final_row)
-        final_row += 1
+    for subject, exam in final_exams:
+        date_str = exam.start.strftime('%a, %b %d')
+        time_str = f"{_format_hm(exam.start)}-{_format_hm(exam.end)}"
+        final_data.append([subjects[subject].abbreviation, exam.paper, date_str, time_str])
+    final_table_style = summary_style + _subject_backgrounds(final_exams, subjects)
 
     # Table dimensions for landscape layout - 5mm (~0.2 inch) spacing between tables
-    available_width = 10.2 * inch
+    available_width = AVAILABLE_WIDTH
     spacing = 0.2 * inch  # About 5mm spacing
     table_width = (available_width - spacing) / 2
     
@@ -241,39 +337,12 @@ def create_exam_summary_page(doc_elements, exam_timetable, legacy_data):
     trial_table = Table(trial_data, colWidths=col_widths)
     final_table = Table(final_data, colWidths=col_widths)
 
-    # Common table style with smaller font and dark grey text
-    table_style_base = [
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('TEXTCOLOR', (0, 1), (-1, -1), dark_grey),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), TEXT_FONT),  # Use text font for summary content
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, dark_grey)
-    ]
-
-    # Apply styling and subject colors to trial table
-    trial_table_style = table_style_base.copy()
-    for subject, rows in trial_subject_rows.items():
-        for row in rows:
-            trial_table_style.append(('BACKGROUND', (0, row), (0, row), subject_colors[subject]))
-
-    # Apply styling and subject colors to final table
-    final_table_style = table_style_base.copy()
-    for subject, rows in final_subject_rows.items():
-        for row in rows:
-            final_table_style.append(('BACKGROUND', (0, row), (0, row), subject_colors[subject]))
-
     trial_table.setStyle(TableStyle(trial_table_style))
     final_table.setStyle(TableStyle(final_table_style))
 
     # Create side-by-side layout with titles using top-level exam display names
-    trial_title = Paragraph(f"<b>{exam_timetable['exams']['trial']['display_name']}</b>", styles['Heading3'])
-    final_title = Paragraph(f"<b>{exam_timetable['exams']['final']['display_name']}</b>", styles['Heading3'])
+    trial_title = Paragraph(f"<b>{config.trial_display_name}</b>", STYLES['Heading3'])
+    final_title = Paragraph(f"<b>{config.final_display_name}</b>", STYLES['Heading3'])
 
     # Create a table to hold both tables side by side
     side_by_side_data = [
@@ -294,30 +363,38 @@ def create_exam_summary_page(doc_elements, exam_timetable, legacy_data):
     doc_elements.append(side_by_side_table)
     doc_elements.append(PageBreak())
 
-def get_exam_for_datetime(dt, trial_exams, final_exams):
+def build_exam_index(trial_exams, final_exams):
+    """Build a (date, hour) -> (subject, exam) lookup covering every hour each exam occupies"""
+    exam_index = {}
+    # Trial exams are indexed first so they win over final exams in the same slot
+    for exam_list in (trial_exams, final_exams):
+        for subject, exam in exam_list:
+            exam_date = exam.start.date()
+            for hour in range(exam.start.hour, exam.end.hour):
+                exam_index.setdefault((exam_date, hour), (subject, exam))
+    return exam_index
+
+def get_exam_for_datetime(dt, exam_index):
     """Check if there's an exam at the given datetime"""
-    # Check trial exams first
-    for subject, exams in trial_exams.items():
-        for exam in exams:
-            if exam['start'].date() == dt.date() and exam['start'].hour <= dt.hour < exam['end'].hour:
-                return subject, exam
-    
-    # Then check final exams
-    for subject, exams in final_exams.items():
-        for exam in exams:
-            if exam['start'].date() == dt.date() and exam['start'].hour <= dt.hour < exam['end'].hour:
-                return subject, exam
-                
-    return None, None
-
-def create_daily_planner_pages(doc_elements, exam_timetable, legacy_data):
-    """Create daily planner pages with 4 days per page"""
-    trial_exams, final_exams, subject_colors, subject_abbreviations, subject_emojis = legacy_data
-    start_date = datetime.fromisoformat(exam_timetable['metadata']['planner_start_date'])
-    end_date = datetime.fromisoformat(exam_timetable['metadata']['planner_end_date'])
-    current_date = start_date
-
-    styles = getSampleStyleSheet()
+    return exam_index.get((dt.date(), dt.hour), (None, None))
+
+@lru_cache(maxsize=None)
+def _daily_col_widths(num_days):
+    """Column widths for a daily planner table: the time column plus equal day columns"""
+    day_col_width = (AVAILABLE_WIDTH - DAILY_TIME_COL_WIDTH) / num_days
+    return (DAILY_TIME_COL_WIDTH,) + (day_col_width,) * num_days
+
+def _needs_merge(exam):
+    """Whether an exam's planner cell should span rows: it lasts an hour or more, or crosses an hour boundary"""
+    start, end = exam.start, exam.end
+    return start.hour != end.hour or end - start >= timedelta(hours=1)
+
+def create_daily_planner_pages(doc_elements, runtime_data, skip_empty_pages=False):
+    """Create daily planner pages with 4 days per page, optionally leaving out pages without exams"""
+    trial_exams, final_exams, subjects, exams_by_date, config = runtime_data
+    end_date = config.end_date
+    current_date = config.start_date
+    first_page = True
 
     while current_date <= end_date:
         # Create a page with up to 4 days
@@ -328,70 +405,45 @@ def create_daily_planner_pages(doc_elements, exam_timetable, legacy_data):
             else:
                 break
 
-        # Page title
-        if len(days) == 4:
-            page_title = f"{days[0].strftime('%A, %b %d')} - {days[3].strftime('%A, %b %d, %Y')}"
-        else:
-            page_title = f"{days[0].strftime('%A, %b %d')} - {days[-1].strftime('%A, %b %d, %Y')}"
+        # Move to next set of days
+        current_date += timedelta(days=4)
+
+        if skip_empty_pages and not any(day.date() in exams_by_date for day in days):
+            continue
+
+        # Page break before every planner page but the first, so skipped pages leave no blank page behind
+        if not first_page:
+            doc_elements.append(PageBreak())
+        first_page = False
+
+        # Page title (full weekday names, unlike the abbreviated column headers)
+        page_title = f"{days[0].strftime('%A, %b %d')} - {days[-1].strftime('%A, %b %d, %Y')}"
 
-        title_para = Paragraph(f"<b>{page_title}</b>", styles['Heading1'])
+        title_para = Paragraph(f"<b>{page_title}</b>", STYLES['Heading1'])
         doc_elements.append(title_para)
         doc_elements.append(Spacer(1, 12))
 
-        # Create table data for all days
+        # Create table data for all days: header row, then one row per hour
+        # with the time label and empty placeholders for each day
         headers = ['Time'] + [day.strftime('%a, %b %d') for day in days]
-        table_data = [headers]
-
-        # Precompute mapping of day index -> list of (subject, exam)
-        day_exams = {i: [] for i in range(len(days))}
-        for subj, exams in trial_exams.items():
-            for ex in exams:
-                for i, d in enumerate(days):
-                    if ex['start'].date() == d.date():
-                        day_exams[i].append((subj, ex))
-        for subj, exams in final_exams.items():
-            for ex in exams:
-                for i, d in enumerate(days):
-                    if ex['start'].date() == d.date():
-                        day_exams[i].append((subj, ex))
-        # sort exams per day by start time
-        for i in day_exams:
-            day_exams[i].sort(key=lambda se: se[1]['start'])
-
-        for hour in range(7, 24):  # 7 AM to 11 PM
-            if hour == 12:
-                time_str = "12:00 PM"
-            elif hour > 12:
-                time_str = f"{hour-12}:00 PM"
-            else:
-                time_str = f"{hour}:00 AM"
+        table_data = [headers] + [[time_str] + [""] * len(days) for time_str in HOUR_LABELS]
 
-            # Initialize row with time label and placeholders
-            row_data = [time_str] + ["" for _ in days]
-            table_data.append(row_data)
+        # Mapping of day index -> list of (subject, exam), already sorted by start time
+        day_exams = {i: exams_by_date.get(d.date(), []) for i, d in enumerate(days)}
 
         # Now populate cells and create spans for qualified items
-        first_hour = 7
-        def needs_merge(ex):
-            start, end = ex['start'], ex['end']
-            duration = end - start
-            crosses_hour = start.hour != end.hour
-            over_hour = duration >= timedelta(hours=1)
-            # merge if > 1 hour or crosses hour boundary
-            return over_hour or crosses_hour
-
         table_style_spans = []
         table_style_backgrounds = []
 
         for day_idx, se_list in day_exams.items():
             col = 1 + day_idx
             for subject, exam in se_list:
-                start = exam['start']
-                end = exam['end']
+                start = exam.start
+                end = exam.end
                 # compute start/end row indices within table_data (account for header row)
-                start_row = 1 + (start.hour - first_hour)
+                start_row = 1 + (start.hour - FIRST_HOUR)
                 start_row = max(1, start_row)
-                end_row = 1 + (end.hour - first_hour)
+                end_row = 1 + (end.hour - FIRST_HOUR)
                 # If exam ends exactly on an hour and doesn't cross into the next hour, we still want merge only if duration >=1h
                 # Ensure end_row at least start_row
                 if end_row < start_row:
@@ -399,86 +451,64 @@ def create_daily_planner_pages(doc_elements, exam_timetable, legacy_data):
 
                 # Place content only in the start row
                 if 1 <= start_row < len(table_data):
-                    table_data[start_row][col] = create_exam_paragraph(subject, exam, subject_emojis, subject_abbreviations)
+                    table_data[start_row][col] = create_exam_paragraph(subject, exam, subjects)
 
                 # Decide if we should span across rows
-                if needs_merge(exam):
-                    # If the exam crosses into the next hour with minutes, include the end hour row as part of span
-                    if start.hour != end.hour and (end.minute > 0 or start.minute > 0 or (end - start) >= timedelta(hours=1)):
-                        # include the end hour row as a visual block
-                        pass  # end_row already points to the end hour row
+                if _needs_merge(exam):
+                    # end_row already points to the end hour row, so the span includes it as a visual block
                     # Apply SPAN from start_row to end_row (clamp within table bounds)
                     span_end = max(start_row, min(end_row, len(table_data) - 1))
                     table_style_spans.append(('SPAN', (col, start_row), (col, span_end)))
                     # Background over the spanned area
-                    table_style_backgrounds.append(('BACKGROUND', (col, start_row), (col, span_end), subject_colors[subject]))
+                    table_style_backgrounds.append(('BACKGROUND', (col, start_row), (col, span_end), subjects[subject].color))
                 else:
                     # Not merged: just color the single cell
-                    table_style_backgrounds.append(('BACKGROUND', (col, start_row), (col, start_row), subject_colors[subject]))
+                    table_style_backgrounds.append(('BACKGROUND', (col, start_row), (col, start_row), subjects[subject].color))
 
         # Create the table with dynamic column widths for landscape orientation
-        # Available width in landscape A4 is about 10.2 inches (11.7 - 1.5 for margins)
-        available_width = 10.2 * inch
-        time_col_width = 0.8 * inch
-        day_col_width = (available_width - time_col_width) / len(days)
-
-        col_widths = [time_col_width] + [day_col_width] * len(days)
-        day_table = Table(table_data, colWidths=col_widths)
-
-        # Base table style - no font settings for content since we use Paragraph objects
-        table_style = [
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),  # Increased header font size from 7 to 9
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            ('GRID', (0, 0), (-1, -1), 1, dark_grey),
-        ]
+        day_table = Table(table_data, colWidths=_daily_col_widths(len(days)))
+
+        table_style = list(DAILY_TABLE_STYLE)
 
-        # Highlight weekends (time blocks only, not headers)
-        for idx, day in enumerate(days):
-            if day.weekday() >= 5:  # Saturday or Sunday
-                table_style.append(('BACKGROUND', (idx + 1, 1), (idx + 1, -1), muted_grey))
+        # Highlight weekends (time blocks only, not headers); Saturday or Sunday
+        table_style.extend(
+            ('BACKGROUND', (idx + 1, 1), (idx + 1, -1), muted_grey)
+            for idx, day in enumerate(days) if day.weekday() >= 5
+        )
 
         # Apply computed spans and backgrounds for exams
-        for span in table_style_spans:
-            table_style.append(span)
-        for bg in table_style_backgrounds:
-            table_style.append(bg)
+        table_style.extend(table_style_spans)
+        table_style.extend(table_style_backgrounds)
 
         day_table.setStyle(TableStyle(table_style))
         doc_elements.append(day_table)
 
-        # Move to next set of days
-        current_date += timedelta(days=4)
-
-        # Add page break if not the last page
-        if current_date <= end_date:
-            doc_elements.append(PageBreak())
-
 
 
-def generate_pdf(exam_timetable, legacy_data, filename=None):
+def generate_pdf(runtime_data, filename=None, skip_empty_pages=False):
     """Generate the complete PDF day planner"""
-    year = exam_timetable['metadata']['year']
+    _ensure_fonts()
+    trial_exams, final_exams, subjects, exams_by_date, config = runtime_data
     if filename is None:
-        filename = f"Grade12_Exam_Day_Planner_{year}.pdf"
-    doc = SimpleDocTemplate(filename, pagesize=landscape(A4),
+        filename = f"Grade12_Exam_Day_Planner_{config.year}.pdf"
+    # Render into memory and write the file in one go once the build succeeds
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4),
                             rightMargin=0.5*inch, leftMargin=0.5*inch,
                             topMargin=0.5*inch, bottomMargin=0.5*inch)
 
     doc_elements = []
 
     # Create exam summary page
-    create_exam_summary_page(doc_elements, exam_timetable, legacy_data)
+    create_exam_summary_page(doc_elements, runtime_data)
 
     # Create daily planner pages
-    create_daily_planner_pages(doc_elements, exam_timetable, legacy_data)
+    create_daily_planner_pages(doc_elements, runtime_data, skip_empty_pages)
 
     # Build the PDF
     doc.build(doc_elements)
+    with open(filename, 'wb') as f:
+        f.write(buffer.getbuffer())
     print(f"PDF generated successfully: {filename}")
 
     return filename
@@ -495,8 +525,9 @@ def export_exam_data_to_json(exam_timetable, filename="exam_timetable.json"):
 @click.command()
 @click.option('--input', '-i', 'input_file', default='custom_data.json', help='Input JSON file with exam data (default: custom_data.json)')
 @click.option('--output', '-o', default=None, help='Output PDF filename (default: Grade12_Exam_Day_Planner_{year}.pdf)')
+@click.option('--skip-empty-pages', is_flag=True, help='Leave out daily planner pages that contain no exams')
 @click.option('--verbose', '-v', is_flag=True, help='Verbose output')
-def main(input_file, output, verbose):
+def main(input_file, output, skip_empty_pages, verbose):
     """Generate Grade 12 exam day planner PDF from JSON data file with color-coded subjects and highlighted exam periods."""
     
     if verbose:
@@ -506,8 +537,8 @@ def main(input_file, output, verbose):
     # Load exam data from JSON file
     exam_timetable = load_exam_data(input_file)
 
-    # Build runtime structures from current JSON (replaces legacy conversion)
-    legacy_data = build_runtime_structures(exam_timetable)
+    # Build runtime structures from current JSON
+    runtime_data = build_runtime_structures(exam_timetable)
     
     if verbose:
         click.echo("✓ Exam data loaded successfully")
@@ -515,7 +546,7 @@ def main(input_file, output, verbose):
     # Generate PDF
     if verbose:
         click.echo("Generating PDF...")
-    pdf_filename = generate_pdf(exam_timetable, legacy_data, output)
+    pdf_filename = generate_pdf(runtime_data, output, skip_empty_pages)
     
     if verbose:
         click.echo(f"✓ PDF generated successfully: {pdf_filename}")